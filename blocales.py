@@ -10,7 +10,7 @@ Algoritmos generales para búsquedas locales
 
 __author__ = 'juliowaissman'
 
-from itertools import takewhile
+from itertools import islice, takewhile
 from math import exp
 from random import random
 
@@ -91,17 +91,29 @@ def descenso_colinas(problema, maxit=1e6):
     return estado
 
 
-def temple_simulado(problema, calendarizador=None, tol=0.001):
+def temple_simulado(problema, calendarizador=None, tol=0.001,
+                    observador=None, observa_cada=1, maxit=None):
     """
     Busqueda local por temple simulado
 
     @param problema: Un objeto de la clase `Problema`.
     @param calendarizador: Un generador de temperatura (simulación).
     @param tol: Temperatura mínima considerada diferente a cero.
+    @param observador: Función opcional que se llama como
+                       observador(estado, costo) (por ejemplo para
+                       animar la búsqueda). Debe regresar rápido para
+                       no frenar el temple.
+    @param observa_cada: Número de iteraciones entre cada llamada al
+                         observador. El muestreo se hace aquí para no
+                         pagar una llamada a función por iteración.
+    @param maxit: Máximo número de iteraciones (None para no limitar).
 
     @return: El estado con el menor costo encontrado
 
     """
+    if observa_cada < 1:
+        raise ValueError("observa_cada debe ser mayor o igual a 1")
+
     if calendarizador is None:
         costos = [problema.costo(problema.estado_aleatorio())
                   for _ in range(10 * len(problema.estado_aleatorio()))]
@@ -112,7 +124,11 @@ def temple_simulado(problema, calendarizador=None, tol=0.001):
     estado = problema.estado_aleatorio()
     costo = problema.costo(estado)
 
-    for T in takewhile(lambda i: i > tol, calendarizador):
+    temperaturas = takewhile(lambda i: i > tol, calendarizador)
+    if maxit is not None:
+        temperaturas = islice(temperaturas, int(maxit))
+
+    for it, T in enumerate(temperaturas):
 
         vecino = problema.vecino_aleatorio(estado)
         costo_vecino = problema.costo(vecino)
@@ -120,4 +136,7 @@ def temple_simulado(problema, calendarizador=None, tol=0.001):
 
         if incremento_costo <= 0 or random() < exp(-incremento_costo / T):
             estado, costo = vecino, costo_vecino
+
+        if observador is not None and it % observa_cada == 0:
+            observador(estado, costo)
     return estado
@@ -17,6 +17,9 @@ desde la termnal se puede instalar utilizando
 
 $pip install pillow
 
+Pillow solo se importa al dibujar, por lo que no es necesario para
+optimizar sin generar imágenes.
+
 """
 
 __author__ = 'Escribe aquí tu nombre'
@@ -26,7 +29,8 @@ import random
 import itertools
 import math
 import time
-from PIL import Image, ImageDraw
+import queue
+import multiprocessing
 
 
 class problema_grafica_grafo(blocales.Problema):
@@ -314,6 +318,8 @@ class problema_grafica_grafo(blocales.Problema):
         aleatoria.
 
         """
+        from PIL import Image, ImageDraw
+
         if not estado:
             estado = self.estado_aleatorio()
 
@@ -325,12 +331,232 @@ class problema_grafica_grafo(blocales.Problema):
         imagen = Image.new('RGB', (self.dim, self.dim), (255, 255, 255))
         dibujar = ImageDraw.ImageDraw(imagen)
 
+        self.pinta_grafo(dibujar, lugar)
+        imagen.save(filename)
+
+    def pinta_grafo(self, dibujar, lugar):
+        """
+        Pinta las aristas y los vertices sobre un objeto ImageDraw ya
+        existente. Se separa de dibuja_grafo para poder reutilizar la
+        misma imagen al dibujar varios cuadros de una animación.
+
+        @param dibujar: Un objeto ImageDraw sobre la imagen destino.
+        @param lugar: Diccionario donde lugar[vertice] = (posX, posY)
+
+        """
         for (v1, v2) in self.aristas:
             dibujar.line((lugar[v1], lugar[v2]), fill=(255, 0, 0))
         for v in self.vertices:
             dibujar.text(lugar[v], v, (0, 0, 0))
 
-        imagen.save(filename)
+
+class animador_grafo(object):
+
+    """
+    Genera una animación de la búsqueda sin frenar el temple simulado.
+
+    Se usa como observador de blocales.temple_simulado: cada `cada`
+    iteraciones (parámetro observa_cada del temple) se envía el estado
+    a una cola acotada, y un proceso aparte lo dibuja. Si la cola está
+    llena el cuadro se descarta, así que la búsqueda nunca espera al
+    dibujo, y al dibujar en otro proceso tampoco compite con ella por
+    el GIL. Todos los cuadros se pintan sobre la misma imagen.
+
+    Solo la secuencia de PNG usa memoria constante. Para el GIF hay
+    que guardar los cuadros hasta el final; cuando se juntan
+    `max_cuadros` se descarta uno de cada dos y se guarda la mitad de
+    los cuadros siguientes, así que la memoria queda acotada pero los
+    cuadros de un recorrido largo quedan más espaciados.
+
+    Ejemplo:
+
+        with animador_grafo(grafo, "animacion.gif") as animador:
+            solucion = blocales.temple_simulado(
+                grafo, observador=animador, observa_cada=animador.cada)
+            animador.estado_final = solucion
+
+    """
+
+    def __init__(self, problema, filename="animacion.gif", cada=100,
+                 max_cola=8, duracion=100, max_cuadros=200):
+        """
+        @param problema: Un objeto de la clase problema_grafica_grafo.
+        @param filename: Si termina en '.gif' se guarda un GIF animado,
+                         en otro caso debe ser un patrón de formato
+                         (por ejemplo 'cuadro_{:05d}.png') y se guarda
+                         una imagen por cuadro.
+        @param cada: Número de iteraciones entre cada cuadro muestreado.
+        @param max_cola: Máximo número de cuadros pendientes de dibujar.
+        @param duracion: Duración de cada cuadro del GIF en milisegundos.
+        @param max_cuadros: Máximo número de cuadros guardados en el GIF.
+
+        """
+        if int(cada) < 1:
+            raise ValueError("cada debe ser mayor o igual a 1")
+        if int(max_cola) < 1:
+            raise ValueError("max_cola debe ser mayor o igual a 1")
+        if int(max_cuadros) < 2:
+            raise ValueError("max_cuadros debe ser mayor o igual a 2")
+        if not filename.lower().endswith('.gif'):
+            try:
+                distintos = filename.format(0) != filename.format(1)
+            except (IndexError, KeyError, ValueError):
+                distintos = False
+            if not distintos:
+                raise ValueError("Para una secuencia de imágenes filename "
+                                 "debe ser un patrón como "
+                                 "'cuadro_{:05d}.png'")
+        self.problema = problema
+        self.filename = filename
+        self.cada = int(cada)
+        self.max_cola = int(max_cola)
+        self.duracion = duracion
+        self.max_cuadros = int(max_cuadros)
+        self.estado_final = None
+        self.cuadros = 0
+        self.descartados = 0
+        self.cola = None
+        self.resultado = None
+        self.proceso = None
+
+    def __call__(self, estado, costo):
+        """
+        Recibe un estado de la búsqueda. Nunca bloquea.
+
+        """
+        try:
+            self.cola.put_nowait(estado)
+        except queue.Full:
+            self.descartados += 1
+
+    def __enter__(self):
+        return self.inicia()
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.termina(self.estado_final)
+        else:
+            # No ocultar el error de la búsqueda con el del dibujo
+            self.cancela()
+
+    def inicia(self):
+        """
+        Arranca el proceso que dibuja los cuadros
+
+        """
+        self.cola = multiprocessing.Queue(self.max_cola)
+        self.resultado = multiprocessing.Queue()
+        self.proceso = multiprocessing.Process(
+            target=_dibuja_cuadros,
+            args=(self.problema, self.filename, self.duracion,
+                  self.max_cuadros, self.cola, self.resultado))
+        self.proceso.daemon = True
+        self.proceso.start()
+        return self
+
+    def termina(self, estado=None):
+        """
+        Espera a que se dibujen los cuadros pendientes y guarda el
+        resultado. Si se da un estado se agrega como último cuadro.
+
+        Si el proceso de dibujo falló, se lanza su excepción.
+
+        """
+        if self.proceso is None:
+            return
+        if estado is not None:
+            self._encola(estado)
+        self._encola(None)
+
+        error = None
+        while True:
+            try:
+                error, self.cuadros = self.resultado.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not self.proceso.is_alive() and self.resultado.empty():
+                    error = RuntimeError(
+                        "El proceso de dibujo terminó con código {}".format(
+                            self.proceso.exitcode))
+                    break
+        self._cierra()
+        if error is not None:
+            raise error
+
+    def cancela(self):
+        """
+        Detiene el proceso de dibujo sin esperar los cuadros pendientes
+        ni guardar la animación.
+
+        """
+        if self.proceso is None:
+            return
+        self.proceso.terminate()
+        self._cierra()
+
+    def _encola(self, estado):
+        # Espera lugar en la cola solo mientras el proceso siga vivo,
+        # para no bloquearse si el dibujo terminó con un error
+        while self.proceso.is_alive():
+            try:
+                self.cola.put(estado, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _cierra(self):
+        # Si el proceso murió pueden quedar cuadros sin leer en la
+        # cola; no hay que esperar a enviarlos para poder salir
+        self.cola.cancel_join_thread()
+        self.proceso.join()
+        self.proceso = None
+
+
+def _dibuja_cuadros(problema, filename, duracion, max_cuadros, cola,
+                    resultado):
+    """
+    Cuerpo del proceso de animador_grafo. Regresa por `resultado` una
+    tupla (error, número de cuadros dibujados), con error None si todo
+    salió bien.
+
+    """
+    cuadros = 0
+    try:
+        from PIL import Image, ImageDraw
+
+        dim = problema.dim
+        imagen = Image.new('RGB', (dim, dim), (255, 255, 255))
+        dibujar = ImageDraw.ImageDraw(imagen)
+        es_gif = filename.lower().endswith('.gif')
+        guardados, paso = [], 1
+
+        while True:
+            estado = cola.get()
+            if estado is None:
+                break
+            if es_gif and cuadros % paso:
+                cuadros += 1
+                continue
+            dibujar.rectangle((0, 0, dim, dim), fill=(255, 255, 255))
+            problema.pinta_grafo(dibujar, problema.estado2dic(estado))
+            if es_gif:
+                # Paleta de 256 colores (un byte por pixel), y al
+                # llegar a max_cuadros se descarta uno de cada dos
+                guardados.append(imagen.convert('P'))
+                if len(guardados) >= max_cuadros:
+                    guardados, paso = guardados[::2], 2 * paso
+            else:
+                imagen.save(filename.format(cuadros))
+            cuadros += 1
+
+        if guardados:
+            guardados[0].save(filename, save_all=True,
+                              append_images=guardados[1:],
+                              duration=duracion, loop=0)
+    except Exception as error:
+        resultado.put((error, cuadros))
+    else:
+        resultado.put((None, cuadros))
 
 
 def main():
@@ -392,6 +618,24 @@ def main():
     print("Costo de la solución encontrada: {}".format(costo_final))
     print("Tiempo de ejecución en segundos: {}".format(t_final - t_inicial))
 
+    # La misma búsqueda, pero guardando una animación del proceso. El
+    # dibujo se hace en otro proceso y los cuadros que no alcanzan a
+    # dibujarse se descartan, así que el tiempo debe ser parecido.
+    t_inicial = time.time()
+    with animador_grafo(grafo_sencillo, "prueba_animacion.gif",
+                        cada=50) as animador:
+        solucion = blocales.temple_simulado(grafo_sencillo,
+                                            observador=animador,
+                                            observa_cada=animador.cada)
+        animador.estado_final = solucion
+    t_final = time.time()
+    print("\nGuardando la animación en prueba_animacion.gif")
+    print("Costo de la solución encontrada: {}".format(
+        grafo_sencillo.costo(solucion)))
+    print("Tiempo de ejecución en segundos: {}".format(t_final - t_inicial))
+    print("Cuadros dibujados: {}, descartados: {}".format(
+        animador.cuadros, animador.descartados))
+
     ##########################################################################
     #                          20 PUNTOS
     ##########################################################################
@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+experimentos.py
+------------
+
+Ejecuta muchos experimentos de búsqueda local en lote.
+
+Lee las especificaciones de un archivo JSONL (un objeto JSON por
+línea), las reparte en un grupo de procesos que se mantiene vivo
+durante todo el lote y escribe los resultados también en JSONL,
+conforme se van obteniendo.
+
+Cada especificación puede tener los campos:
+
+    id             Identificador del experimento (por default el
+                   número de línea).
+    problema       'nreinas' o 'grafo'.
+    n              Número de reinas (para 'nreinas', default 8).
+    archivo        Archivo JSON con {"vertices": [...], "aristas":
+                   [[v1, v2], ...]} (para 'grafo').
+    dimension      Dimensión de la imagen (para 'grafo', default 400).
+    algoritmo      'temple_simulado' (default) o 'descenso_colinas'.
+    calendarizador {"tipo": "lineal" | "exponencial" | "logaritmico",
+                    "T_ini": ..., "alfa": ...}. Si no se da se usa el
+                   calendarizador por default de blocales.
+    tol            Temperatura mínima (temple simulado).
+    maxit          Máximo de iteraciones (default 1e6). En el temple
+                   simulado evita que un calendarizador que enfría
+                   muy lento (como el logarítmico) ocupe para siempre
+                   un proceso.
+    semilla        Semilla para el generador de números aleatorios.
+                   Si no se da, se usa una semilla nueva en cada
+                   experimento.
+
+Las líneas que no se pueden leer, o los experimentos que fallan,
+producen un resultado con el campo "error" sin detener el lote.
+
+Ejemplo:
+
+$python experimentos.py specs.jsonl -o resultados.jsonl -j 4
+
+Con --demo se corre un lote pequeño de prueba (incluyendo líneas con
+errores) en lugar de leer un archivo.
+
+"""
+
+__author__ = 'Escribe aquí tu nombre'
+
+import argparse
+import functools
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+
+import blocales
+
+
+def calendarizador(tipo="lineal", T_ini=None, alfa=0.99):
+    """
+    Genera un calendarizador de temperatura a partir de sus parámetros
+
+    @param tipo: 'lineal' (T_ini / (1 + i)), 'exponencial'
+                 (T_ini * alfa^i) o 'logaritmico' (T_ini / log(2 + i)).
+    @param T_ini: Temperatura inicial.
+    @param alfa: Factor de enfriamiento para el calendarizador
+                 exponencial, 0 < alfa < 1.
+
+    @return: Un generador de temperaturas.
+
+    """
+    if T_ini is None or T_ini <= 0:
+        raise ValueError("El calendarizador requiere T_ini > 0")
+    if tipo == "lineal":
+        return (T_ini / (1 + i) for i in itertools.count())
+    if tipo == "exponencial":
+        if not 0 < alfa < 1:
+            raise ValueError("El calendarizador exponencial requiere "
+                             "0 < alfa < 1")
+        return (T_ini * alfa ** i for i in itertools.count())
+    if tipo == "logaritmico":
+        return (T_ini / math.log(2 + i) for i in itertools.count())
+    raise ValueError("Calendarizador desconocido: {}".format(tipo))
+
+
+@functools.lru_cache(maxsize=None)
+def carga_grafo(archivo):
+    """
+    Lee un grafo de un archivo JSON. Se guarda en cache para que cada
+    proceso lo lea una sola vez aunque se use en muchos experimentos.
+
+    @param archivo: Ruta al archivo con {"vertices": [...],
+                    "aristas": [[v1, v2], ...]}
+
+    @return: Una tupla (vertices, aristas).
+
+    """
+    with open(archivo) as f:
+        grafo = json.load(f)
+    return (list(grafo["vertices"]),
+            [tuple(arista) for arista in grafo["aristas"]])
+
+
+def construye_problema(spec):
+    """
+    Construye el objeto Problema que describe una especificación
+
+    """
+    tipo = spec.get("problema", "nreinas")
+    if tipo == "nreinas":
+        from nreinas import ProblemaNreinas
+        return ProblemaNreinas(spec.get("n", 8))
+    if tipo == "grafo":
+        from dibuja_grafo import problema_grafica_grafo
+        vertices, aristas = carga_grafo(spec["archivo"])
+        return problema_grafica_grafo(vertices, aristas,
+                                      spec.get("dimension", 400))
+    raise ValueError("Problema desconocido: {}".format(tipo))
+
+
+def ejecuta(entrada):
+    """
+    Ejecuta un experimento. Los errores se regresan como parte del
+    resultado para no detener el resto del lote.
+
+    @param entrada: Una tupla (numero de línea, texto de la línea).
+
+    @return: Un diccionario con el resultado del experimento.
+
+    """
+    linea, texto = entrada
+    resultado = {"id": linea}
+    try:
+        spec = json.loads(texto)
+        if not isinstance(spec, dict):
+            raise TypeError("La especificación debe ser un objeto JSON")
+        resultado["id"] = spec.get("id", linea)
+
+        # Sin semilla se reinicia el generador, para no heredar el
+        # estado de un experimento anterior en el mismo proceso
+        random.seed(spec.get("semilla"))
+        problema = construye_problema(spec)
+        algoritmo = spec.get("algoritmo", "temple_simulado")
+
+        t_inicial = time.time()
+        if algoritmo == "temple_simulado":
+            calendario = spec.get("calendarizador")
+            estado = blocales.temple_simulado(
+                problema,
+                calendarizador=(calendarizador(**calendario)
+                                if calendario else None),
+                tol=spec.get("tol", 0.001),
+                maxit=spec.get("maxit", 1e6))
+        elif algoritmo == "descenso_colinas":
+            estado = blocales.descenso_colinas(problema,
+                                               spec.get("maxit", 1e6))
+        else:
+            raise ValueError("Algoritmo desconocido: {}".format(algoritmo))
+        t_final = time.time()
+
+        resultado.update(costo=problema.costo(estado),
+                         estado=list(estado),
+                         tiempo=t_final - t_inicial)
+    except Exception as error:
+        resultado["error"] = "{}: {}".format(type(error).__name__, error)
+    return resultado
+
+
+def lee_specs(archivo):
+    """
+    Generador de (número de línea, texto) de un archivo JSONL,
+    ignorando las líneas vacías. El texto se interpreta en ejecuta,
+    para que una línea mal formada solo afecte a su resultado.
+
+    """
+    for linea, texto in enumerate(archivo, 1):
+        if texto.strip():
+            yield linea, texto
+
+
+def _ignora_sigint():
+    # Los procesos del grupo ignoran Ctrl-C; el proceso principal es
+    # el que lo atiende y termina el grupo
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def escribe_resultados(specs, salida, procesos=None, chunksize=16,
+                       desordenado=False):
+    """
+    Ejecuta los experimentos y escribe un resultado JSON por línea
+    conforme se obtienen.
+
+    Si la escritura falla o se interrumpe el lote, los procesos se
+    terminan sin esperar a los experimentos pendientes.
+
+    @param specs: Iterable de (número de línea, texto de la línea).
+    @param salida: Archivo donde se escriben los resultados.
+    @param procesos: Número de procesos (1 para no usar el grupo).
+    @param chunksize: Experimentos enviados a la vez a cada proceso.
+    @param desordenado: Si es True se escribe cada resultado en cuanto
+                        termina, sin respetar el orden de entrada.
+
+    """
+    if procesos == 1:
+        for resultado in map(ejecuta, specs):
+            salida.write(json.dumps(resultado) + "\n")
+            salida.flush()
+        return
+
+    pool = multiprocessing.Pool(procesos, initializer=_ignora_sigint)
+    mapa = pool.imap_unordered if desordenado else pool.imap
+    try:
+        for resultado in mapa(ejecuta, specs, chunksize):
+            salida.write(json.dumps(resultado) + "\n")
+            salida.flush()
+    except BaseException:
+        pool.terminate()
+        pool.join()
+        raise
+    pool.close()
+    pool.join()
+
+
+def prueba_lote():
+    """
+    Corre un lote pequeño con experimentos válidos y con errores, y
+    revisa que cada línea produzca su resultado sin detener el lote
+
+    """
+    lineas = [
+        '{"id": "reinas", "n": 8, "semilla": 1}',
+        '{"id": "colinas", "n": 10, "algoritmo": "descenso_colinas"}',
+        '{"id": "maxit", "n": 6, "maxit": 1000,'
+        ' "calendarizador": {"tipo": "logaritmico", "T_ini": 5}}',
+        '{"id": "alfa", "calendarizador":'
+        ' {"tipo": "exponencial", "T_ini": 5, "alfa": 1}}',
+        '{"n": 6',
+        '[1, 2]',
+    ]
+
+    class Salida(list):
+        def write(self, texto):
+            self.append(json.loads(texto))
+
+        def flush(self):
+            pass
+
+    salida = Salida()
+    escribe_resultados(enumerate(lineas, 1), salida, procesos=2,
+                       chunksize=2)
+    for resultado in salida:
+        print(json.dumps(resultado))
+
+    errores = [r["id"] for r in salida if "error" in r]
+    assert [r["id"] for r in salida] == ["reinas", "colinas", "maxit",
+                                        "alfa", 5, 6]
+    assert errores == ["alfa", 5, 6]
+    assert salida[2]["tiempo"] < 1.0
+
+
+def main(argv=None):
+    """
+    La función principal
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Ejecuta experimentos de búsqueda local en lote")
+    parser.add_argument("specs", type=argparse.FileType("r"), nargs="?",
+                        help="archivo JSONL con los experimentos "
+                             "('-' para la entrada estándar)")
+    parser.add_argument("-o", "--salida", type=argparse.FileType("w"),
+                        default=sys.stdout,
+                        help="archivo JSONL con los resultados")
+    parser.add_argument("-j", "--procesos", type=int, default=None,
+                        help="número de procesos (default: núm. de CPUs)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="experimentos enviados a la vez a cada "
+                             "proceso (default: 16)")
+    parser.add_argument("--desordenado", action="store_true",
+                        help="escribe cada resultado en cuanto termina, "
+                             "sin respetar el orden de entrada")
+    parser.add_argument("--demo", action="store_true",
+                        help="corre un lote pequeño de prueba")
+    args = parser.parse_args(argv)
+
+    if args.demo:
+        prueba_lote()
+        return
+    if args.specs is None:
+        parser.error("falta el archivo con los experimentos")
+    if args.procesos is not None and args.procesos < 1:
+        parser.error("-j debe ser mayor o igual a 1")
+    if args.chunksize < 1:
+        parser.error("--chunksize debe ser mayor o igual a 1")
+
+    try:
+        escribe_resultados(lee_specs(args.specs), args.salida,
+                           args.procesos, args.chunksize, args.desordenado)
+    except BrokenPipeError:
+        # Quien lee la salida ya no quiere más resultados (por ejemplo
+        # `| head`); se redirige stdout para que Python no vuelva a
+        # fallar al cerrarla
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -109,10 +109,28 @@ def prueba_temple_simulado(problema=ProblemaNreinas(8)):
     print(solucion)
 
 
+def prueba_observador(problema=ProblemaNreinas(8), iteraciones=10000,
+                      observa_cada=100):
+    """
+    Prueba el observador del temple simulado: con una temperatura
+    constante se hacen exactamente `iteraciones` iteraciones, y el
+    observador se llama una vez cada `observa_cada` de ellas
+
+    """
+    costos = []
+    blocales.temple_simulado(problema, [1.0] * iteraciones,
+                             observador=lambda e, c: costos.append(c),
+                             observa_cada=observa_cada)
+    print("\n\nObservador llamado {} veces en {} iteraciones".format(
+        len(costos), iteraciones))
+    assert len(costos) == len(range(0, iteraciones, observa_cada))
+
+
 if __name__ == "__main__":
 
     prueba_descenso_colinas(ProblemaNreinas(32), 10)
     prueba_temple_simulado(ProblemaNreinas(32))
+    prueba_observador(ProblemaNreinas(8))
 
     ##########################################################################
     #                          20 PUNTOS